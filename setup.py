@@ -29,6 +29,8 @@ if __name__ == '__main__':
         },
         install_requires=[
             'urwid >= 2.0.1',
+            'marisa-trie',
             'python-mpd2 < 2.0.0',
+            'uvloop; sys_platform != "win32"',
         ],
     )
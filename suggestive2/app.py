@@ -1,4 +1,7 @@
 import asyncio
+import bisect
+import difflib
+import marisa_trie
 import urwid
 import argparse
 import logging
@@ -6,13 +9,15 @@ import weakref
 import functools
 import os
 import itertools
-from collections import defaultdict
-from typing import List, NamedTuple, Tuple, Dict, Callable, Union, Any, Set, Iterable, Optional
+import operator
+from collections import OrderedDict
+from typing import (List, NamedTuple, Tuple, Dict, Callable, Union, Any, FrozenSet, Iterable,
+                    Optional, Hashable)
 
 from suggestive2.monkey import monkeypatch
-from suggestive2.mpd import MPDClient
+from suggestive2.mpd import MPDClient, tag_command
 from suggestive2.types import Config
-from suggestive2.util import run_method_coroutine, expand, prefix_matches
+from suggestive2.util import run_method_coroutine, expand, key_sequence_trie, normalize
 import suggestive2.config as default_config
 
 
@@ -20,14 +25,53 @@ LOG = logging.getLogger('suggestive2')
 LOG.addHandler(logging.NullHandler())
 
 
+LIBRARY_CHUNK_SIZE = 64
+LIBRARY_CACHE_SIZE = 2048
+SYNC_DELAY = 0.05
+IDLE_RETRY_DELAY = 0.5
+IDLE_MAX_RETRY_DELAY = 30.0
+SEARCH_CACHE_SIZE = 64
+KEYPRESS_DELAY = 0.05
+
+# Fast path for tracks that have all of their tags
+TRACK_INFO = operator.itemgetter('id', 'artist', 'album', 'title')
+ALBUM_INFO = operator.itemgetter('albumartist', 'album')
+
+
 monkeypatch()
 
+try:
+    import uvloop
+except ImportError:
+    pass
+else:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+@functools.lru_cache(maxsize=4096)
+def album_label(artist: str, album: str) -> str:
+    # Many playlist tracks share an album, so they can share its label, too
+    return f'{artist} - {album}'
+
+
+def build_search_index(words: Iterable[Tuple[str, int]]) -> Dict[str, FrozenSet[int]]:
+    index: Dict[str, List[int]] = {}
+    for word, row in words:
+        index.setdefault(word, []).append(row)
+
+    return {word: frozenset(rows) for word, rows in index.items()}
+
 
 class LibraryListWalker(urwid.ListWalker):
 
     def __init__(self):
         self.library: List[Tuple[str, str]] = []
-        self.contents: List[urwid.Widget] = []
+        self.labels: List[str] = []
+        self.version: int = 0
+        # Recently used row widgets by album, least recently used first. Keyed by album rather
+        # than position so that reloads, which usually bring back mostly the same albums, can
+        # reuse them
+        self.contents: OrderedDict[Tuple[str, str], urwid.Widget] = OrderedDict()
         self.focus: int = 0
 
     def positions(self, reverse=False):
@@ -45,7 +89,8 @@ class LibraryListWalker(urwid.ListWalker):
 
     def clear(self):
         self.library[:] = []
-        self.contents[:] = []
+        self.labels[:] = []
+        self.version += 1
         self._modified()
 
     def get_next(self, current):
@@ -58,17 +103,32 @@ class LibraryListWalker(urwid.ListWalker):
         if position < 0:
             return None, None
 
-        if position >= len(self.contents):
-            if position >= len(self.library):
-                app.run_coroutine(self.load, weakref.ref(app))
-                return None, None
-            else:
-                self.contents.extend(
-                    urwid.AttrMap(LibraryAlbum(artist, album), 'album', 'focus album')
-                    for artist, album in self.library[len(self.contents):position + 1]
-                )
+        if position >= len(self.library):
+            app.run_coroutine(self.load, app.weak)
+            return None, None
 
-        return self.contents[position], position
+        key = self.library[position]
+        widget = self.contents.get(key)
+        if widget is None:
+            self._build(position)
+            widget = self.contents[key]
+
+        self.contents.move_to_end(key)
+        while len(self.contents) > LIBRARY_CACHE_SIZE:
+            self.contents.popitem(last=False)
+
+        return widget, position
+
+    def _build(self, position):
+        # Build widgets a chunk at a time, staying one chunk ahead of the position
+        start = position // LIBRARY_CHUNK_SIZE * LIBRARY_CHUNK_SIZE
+        end = min(len(self.library), start + 2 * LIBRARY_CHUNK_SIZE)
+        for i in range(start, end):
+            key = self.library[i]
+            if key not in self.contents:
+                artist, album = key
+                self.contents[key] = urwid.AttrMap(
+                    LibraryAlbum(artist, album, self.labels[i]), 'album', 'focus album')
 
     async def load(self, appref):
         app = appref()
@@ -76,10 +136,30 @@ class LibraryListWalker(urwid.ListWalker):
             return
 
         client = await app.async_mpd()
-        self.library = [(obj['albumartist'], obj['album'])
-                        async for obj in client.list('albumartist', groupby=('album',))]
+
+        # MPD can't report the number of artist/album pairs without listing them, and another
+        # round trip to size the lists up front would cost more than letting them grow
+        library = []
+        labels = []
+        async for obj in client.list('albumartist', groupby=('album',)):
+            # Keep the raw tags for commands, since MPD may compare them byte for byte; only
+            # what's displayed and searched is normalized
+            artist, album = ALBUM_INFO(obj)
+            library.append((artist, album))
+            # Every library row is a distinct album, so there's nothing to share here
+            labels.append(f'{normalize(artist)} - {normalize(album)}')
+
+        self.library = library
+        self.labels = labels
+        self.version += 1
         self._modified()
 
+    def search_words(self) -> Iterable[Tuple[str, int]]:
+        return itertools.chain.from_iterable(
+            ((normalize(artist).casefold(), i), (normalize(album).casefold(), i))
+            for i, (artist, album) in enumerate(self.library)
+        )
+
     # def find(self, pattern):
     #     word_to_idx = sorted(itertools.chain.from_iterable(
     #         ((artist, i), (album, i))
@@ -109,12 +189,27 @@ class CommandPrompt(urwid.Edit):
         self.search_results = []
         self.keypress_callback: Optional[Callable] = None
         self.complete_callback: Optional[Callable] = None
+        self.pending_keypress: Optional[asyncio.TimerHandle] = None
 
     def clear(self):
+        self.cancel_keypress()
         self.set_caption('')
         self.set_edit_text('')
         self.search_results.clear()
 
+    def cancel_keypress(self) -> bool:
+        if self.pending_keypress is None:
+            return False
+
+        self.pending_keypress.cancel()
+        self.pending_keypress = None
+        return True
+
+    def run_keypress_callback(self) -> None:
+        self.pending_keypress = None
+        if self.keypress_callback is not None:
+            self.keypress_callback(self.get_edit_text())
+
     def start(self,
               keypress_callback: Callable,
               complete_callback: Callable,
@@ -131,6 +226,10 @@ class CommandPrompt(urwid.Edit):
         elif key == 'enter':
             app.widget_by_name('top').focus_body()
 
+            # Make sure the callback has seen the final text before completing
+            if self.cancel_keypress():
+                self.run_keypress_callback()
+
             if self.complete_callback is not None:
                 self.complete_callback(self.get_edit_text())
 
@@ -138,13 +237,16 @@ class CommandPrompt(urwid.Edit):
         else:
             result = super().keypress(size, key)
 
-            if self.keypress_callback is not None:
-                self.keypress_callback(self.get_edit_text())
+            # Only run the callback once typing pauses
+            self.cancel_keypress()
+            self.pending_keypress = app.loop.call_later(KEYPRESS_DELAY,
+                                                        self.run_keypress_callback)
 
             return result
 
 
 class VimListBox(urwid.ListBox):
+
     REMAP = {
         'k': 'up',
         'j': 'down',
@@ -153,21 +255,35 @@ class VimListBox(urwid.ListBox):
         'ctrl f': 'page down',
         'ctrl b': 'page up',
     }
+    # Split by key length, so that named keys (arrows, enter, ...) aren't looked up among the
+    # single-character ones that make up most of the map
+    remap_char = {key: value for key, value in REMAP.items() if len(key) == 1}.get
+    remap_name = {key: value for key, value in REMAP.items() if len(key) > 1}.get
 
     def __init__(self, body):
         super().__init__(body)
-        self.search_contents: Dict[str, Set[int]] = {}
-        self.search_results: List[List[str]] = []
+        # Bumped whenever the searchable contents change
+        self.version: int = 0
+        self.search_contents: Dict[str, FrozenSet[int]] = {}
+        self.search_version: int = -1
+        self.search_trie = marisa_trie.Trie()
+        self.search_cache: OrderedDict[str, List[str]] = OrderedDict()
+        self.search_prefix: str = ''
+        self.search_matches: List[str] = []
         self.search_result: List[int] = []
         self.focus_position: int
 
     def keypress(self, size, key: str):
         if key == '/':
-            search_contents: Dict[str, Set[int]] = defaultdict(set)
-            for key, value in self.get_search_contents():
-                search_contents[key.lower()].add(value)
+            version = self.get_version()
+            if self.search_version != version:
+                self.search_contents = self.build_search_contents()
+                self.search_trie = marisa_trie.Trie(self.search_contents)
+                self.search_cache.clear()
+                self.search_version = version
 
-            self.search_contents = search_contents
+            self.search_prefix = ''
+            self.search_matches = []
 
             app.widget_by_name('command_prompt').start(
                 self.search_keypress,
@@ -180,41 +296,56 @@ class VimListBox(urwid.ListBox):
         elif key == 'N':
             self.prev_search_match()
         else:
-            return super().keypress(size, self.REMAP.get(key, key))
+            key = self.remap_char(key, key) if len(key) == 1 else self.remap_name(key, key)
+            return super().keypress(size, key)
+
+    def get_version(self) -> int:
+        return self.version
 
     def get_search_contents(self) -> Iterable[Tuple[str, int]]:
+        # (casefolded word, row index) pairs
         raise NotImplementedError
 
+    def build_search_contents(self) -> Dict[str, FrozenSet[int]]:
+        return build_search_index(self.get_search_contents())
+
     def search_keypress(self, value: str) -> None:
-        if not value:
+        prefix = normalize(value).casefold()
+        if not prefix:
+            self.search_prefix = ''
+            self.search_matches = []
             return
 
-        assert len(value) != len(self.search_results)
+        matches = self.search_cache.get(prefix)
+        if matches is None:
+            if self.search_prefix and prefix.startswith(self.search_prefix):
+                # Extending the prefix can only narrow down the previous matches
+                matches = [word for word in self.search_matches if word.startswith(prefix)]
+            else:
+                matches = self.search_trie.keys(prefix)
 
-        if len(value) < len(self.search_results):
-            self.search_results.pop()
+            self.search_cache[prefix] = matches
+            if len(self.search_cache) > SEARCH_CACHE_SIZE:
+                self.search_cache.popitem(last=False)
         else:
-            words = (self.search_results[-1]
-                     if self.search_results
-                     else sorted(self.search_contents))
-            self.search_results.append(prefix_matches(value.lower(), words))
-
-        if not self.search_results:
-            return
+            self.search_cache.move_to_end(prefix)
 
-        LOG.debug('Current search results for prefix %s: %s', value, self.search_results[-1])
+        self.search_prefix = prefix
+        self.search_matches = matches
+        LOG.debug('Current search results for prefix %s: %s', value, self.search_matches)
 
     def search_complete(self, value) -> None:
-        if not self.search_results:
+        if not value:
             LOG.info('No search performed')
             return
 
-        self.search_result = sorted(set(itertools.chain.from_iterable(
+        self.search_result = sorted(set().union(*(
             self.search_contents[word]
-            for word in self.search_results[-1]
+            for word in self.search_matches
         )))
 
-        self.search_results.clear()
+        self.search_prefix = ''
+        self.search_matches = []
         if not self.search_result:
             LOG.info("No search results found for pattern '%s'", value)
             return
@@ -228,10 +359,8 @@ class VimListBox(urwid.ListBox):
         if not self.search_result:
             return
 
-        idx = next(
-            (i for i in self.search_result if i > self.focus_position),
-            self.search_result[0],
-        )
+        pos = bisect.bisect_right(self.search_result, self.focus_position)
+        idx = self.search_result[pos] if pos < len(self.search_result) else self.search_result[0]
         LOG.debug('Next search match is at index %d', idx)
         self.focus_position = idx
 
@@ -239,27 +368,30 @@ class VimListBox(urwid.ListBox):
         if not self.search_result:
             return
 
-        idx = next(
-            (i for i in reversed(self.search_result) if i < self.focus_position),
-            self.search_result[-1],
-        )
+        pos = bisect.bisect_left(self.search_result, self.focus_position)
+        idx = self.search_result[pos - 1] if pos > 0 else self.search_result[-1]
 
         LOG.debug('Previous search match is at index %d', idx)
         self.focus_position = idx
 
 
 class LibraryAlbum(urwid.WidgetWrap):
+    # WidgetWrap instances still have a __dict__, but keep the per-row attributes out of it
+    __slots__ = ('artist', 'album')
 
-    def __init__(self, artist: str, album: str) -> None:
+    def __init__(self, artist: str, album: str, label: Optional[str] = None) -> None:
         self.artist = artist
         self.album = album
 
-        widget = urwid.SelectableIcon(f'{artist} - {album}')
+        if label is None:
+            label = f'{normalize(artist)} - {normalize(album)}'
+
+        widget = urwid.SelectableIcon(label)
         super().__init__(widget)
 
     def keypress(self, size, key: str):
         if key in ('enter', ' '):
-            app.run_coroutine(self.enqueue, weakref.ref(app), key == 'enter')
+            app.run_coroutine(self.enqueue, app.weak, key == 'enter')
         else:
             return super().keypress(size, key)
 
@@ -269,35 +401,35 @@ class LibraryAlbum(urwid.WidgetWrap):
             return
 
         client = await app.async_mpd()
-        await client.searchadd(artist=self.artist, album=self.album)
 
-        if play:
-            tracks = [track async for track in client.playlistsearch(artist=self.artist,
-                                                                     album=self.album)]
-            if not tracks:
-                raise ValueError('There should be tracks here...')
+        # The album is appended to the end of the playlist, so its first track will be at the
+        # current playlist length
+        if not play:
+            await client.searchadd(artist=self.artist, album=self.album)
+            return
 
-            first = tracks[0]
-            last_track_id = next(track['id']
-                                 for track in reversed(tracks)
-                                 if track['title'] == first['title'])
-            await client.playid(int(last_track_id))
+        position = int((await client.status())['playlistlength'])
+        await client.pipeline(
+            tag_command(b'searchadd', {'artist': self.artist, 'album': self.album}),
+            b'play %d\n' % position,
+        )
 
 
 class Library(VimListBox):
+    _body: LibraryListWalker
 
     def __init__(self):
         self._body = LibraryListWalker()
         super().__init__(self._body)
 
+    def get_version(self) -> int:
+        return self._body.version
+
     def clear(self):
         self._body.clear()
 
     def get_search_contents(self) -> Iterable[Tuple[str, int]]:
-        return (itertools.chain.from_iterable(
-            ((artist, i), (album, i))
-            for i, (artist, album) in enumerate(self._body.library)
-        ))
+        return self._body.search_words()
 
     # def __init__(self):
     #     self._body = urwid.SimpleFocusListWalker([])
@@ -309,6 +441,7 @@ class Library(VimListBox):
 
 
 class PlaylistTrack(urwid.WidgetWrap):
+    __slots__ = ('mpd_id', 'artist', 'album', 'track')
 
     def __init__(self, mpd_id: Union[str, int], artist: str, album: str, track: str) -> None:
         self.mpd_id: int = int(mpd_id)
@@ -316,17 +449,20 @@ class PlaylistTrack(urwid.WidgetWrap):
         self.album = album
         self.track = track
 
-        widget = urwid.SelectableIcon(f'{artist} - {album} - {track}')
+        widget = urwid.SelectableIcon(f'{album_label(artist, album)} - {track}')
         super().__init__(widget)
 
     @classmethod
     def from_mpd_info(cls, info):
-        return cls(
-            info.get('id'),
-            info.get('artist', info.get('albumartist', 'Unknown')),
-            info.get('album', 'Unknown'),
-            info.get('title', 'Unknown'),
-        )
+        try:
+            mpd_id, artist, album, title = TRACK_INFO(info)
+        except KeyError:
+            mpd_id = info.get('id')
+            artist = info.get('artist', info.get('albumartist', 'Unknown'))
+            album = info.get('album', 'Unknown')
+            title = info.get('title', 'Unknown')
+
+        return cls(mpd_id, normalize(artist), normalize(album), normalize(title))
 
 # {
 #     'file': 'The Black Angels/Phosphene Dream/05 River of Blood.mp3',
@@ -347,32 +483,107 @@ class PlaylistTrack(urwid.WidgetWrap):
 # }
 
 
+def mark_playing(widget: urwid.AttrMap, playing: bool) -> None:
+    attr_map: Dict[Hashable, Hashable] = {None: 'playing' if playing else 'track'}
+    focus_map: Dict[Hashable, Hashable] = {None: 'focus playing' if playing else 'focus track'}
+    widget.set_attr_map(attr_map)
+    widget.set_focus_map(focus_map)
+
+
 class Playlist(VimListBox):
+    _body: urwid.SimpleFocusListWalker
 
     def __init__(self):
         self._body = urwid.SimpleFocusListWalker([])
         super().__init__(self._body)
+        self.pending_sync: Optional[asyncio.TimerHandle] = None
+        self.track_ids: List[int] = []
+        self.playing_id: Optional[int] = None
+        self.syncing = False
+        self.resync = False
+
+    def set_contents(self,
+                     items: List[Dict[str, str]],
+                     playing: Optional[int] = None,
+                     ids: Optional[List[int]] = None) -> None:
+        old_ids = self.track_ids
+        new_ids = [int(item['id']) for item in items] if ids is None else ids
+        new_playing_id = (new_ids[playing]
+                          if playing is not None and playing < len(new_ids)
+                          else None)
+
+        if new_ids != old_ids:
+            focus_id = old_ids[self.focus_position] if old_ids else None
+
+            # Only rebuild the rows that changed, keeping the widgets for the rest
+            matcher = difflib.SequenceMatcher(None, old_ids, new_ids, autojunk=False)
+            for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+                if tag != 'equal':
+                    self._body[i1:i2] = [
+                        urwid.AttrMap(PlaylistTrack.from_mpd_info(item), 'track', 'focus track')
+                        for item in items[j1:j2]
+                    ]
+
+            self.track_ids = new_ids
+            self.version += 1
+
+            if focus_id in new_ids:
+                self._body.set_focus(new_ids.index(focus_id))
+        elif new_playing_id == self.playing_id:
+            # Nothing changed at all
+            return
 
-    def set_contents(self, contents):
-        self._body[:] = contents
+        # Usually only the playing track has changed, so just move the highlight
+        if self.playing_id in new_ids:
+            mark_playing(self._body[new_ids.index(self.playing_id)], False)
+
+        self.playing_id = new_playing_id
+        if playing is not None and new_playing_id is not None:
+            mark_playing(self._body[playing], True)
+
+    def schedule_sync(self, appref: weakref.ref) -> None:
+        # MPD tends to report changes in bursts, so coalesce them into a single sync
+        if self.pending_sync is not None:
+            return
+
+        self.pending_sync = app.loop.call_later(SYNC_DELAY, self._start_sync, appref)
+
+    def _start_sync(self, appref: weakref.ref) -> None:
+        self.pending_sync = None
+        app.run_coroutine(self.sync, appref)
 
     async def sync(self, appref):
+        # Only one sync at a time; requests that arrive meanwhile are folded into one more run
+        if self.syncing:
+            self.resync = True
+            return
+
+        self.syncing = True
+        try:
+            self.resync = True
+            while self.resync:
+                self.resync = False
+                await self._sync(appref)
+        finally:
+            self.syncing = False
+
+    async def _sync(self, appref):
         app = appref()
         if not app:
             return
 
         client = await app.async_mpd()
-        items = [item async for item in client.playlistinfo()]
+
+        items: List[Dict[str, str]] = []
+        ids: List[int] = []
+        async for item in client.playlistinfo():
+            items.append(item)
+            ids.append(int(item['id']))
 
         playing_track = await client.currentsong()
         playing_idx = int(playing_track['pos']) if playing_track else None
 
-        self.set_contents([
-            urwid.AttrMap(PlaylistTrack.from_mpd_info(item),
-                          'playing' if i == playing_idx else 'track',
-                          'focus playing' if i == playing_idx else 'focus track')
-            for i, item in enumerate(items)
-        ])
+        self.set_contents(items, playing_idx, ids)
 
     async def play(self, appref: weakref.ref, index: Optional[int] = None) -> None:
         app = appref()
@@ -401,15 +612,17 @@ class Playlist(VimListBox):
     def get_search_contents(self) -> Iterable[Tuple[str, int]]:
         widgets = (widget.base_widget for widget in self._body)
         return itertools.chain.from_iterable(
-            ((track.artist, i), (track.album, i), (track.track, i))
+            ((track.artist.casefold(), i),
+             (track.album.casefold(), i),
+             (track.track.casefold(), i))
             for i, track in enumerate(widgets)
         )
 
     def keypress(self, size, key: str):
         if key == 'enter':
-            app.run_coroutine(self.play, weakref.ref(app))
+            app.run_coroutine(self.play, app.weak)
         elif key == 'd':
-            app.run_coroutine(self.delete, weakref.ref(app))
+            app.run_coroutine(self.delete, app.weak)
         else:
             return super().keypress(size, key)
 
@@ -460,9 +673,9 @@ class TopLevel(urwid.WidgetWrap):
         if key == 'q':
             raise urwid.ExitMainLoop
         elif key == 'c':
-            app.loop.create_task(functools.partial(mpd_clear, weakref.ref(app))())
+            app.loop.create_task(mpd_clear(app.weak))
         elif key == 'p':
-            app.loop.create_task(functools.partial(mpd_pause, weakref.ref(app))())
+            app.loop.create_task(mpd_pause(app.weak))
         elif key == ':':
             app.widget_by_name('command_prompt').start(
                 announce,
@@ -470,9 +683,9 @@ class TopLevel(urwid.WidgetWrap):
             )
             self._w.set_focus('footer')
         elif key == '>':
-            app.loop.create_task(functools.partial(mpd_next, weakref.ref(app))())
+            app.loop.create_task(mpd_next(app.weak))
         elif key == '<':
-            app.loop.create_task(functools.partial(mpd_previous, weakref.ref(app))())
+            app.loop.create_task(mpd_previous(app.weak))
         else:
             return super().keypress(size, key)
 
@@ -496,44 +709,52 @@ def generate_palette() -> List[Tuple[str, str, str, str, str, str]]:
         Palette(name='focus playing', fg='#000', bg='#0ff', bold=True, invert=True),
     ]
 
-    colors = (
-        (p, p.bg if p.invert else p.fg, p.fg if p.invert else p.bg)
-        for p in palette
-    )
-
-    return [
-        (
+    entries = []
+    for p in palette:
+        fg, bg = (p.bg, p.fg) if p.invert else (p.fg, p.bg)
+        entries.append((
             p.name,
             'default',
             'default',
             'default',
             f'bold,{fg}' if p.bold else fg,
             bg,
-        ) for p, fg, bg in colors
-    ]
+        ))
+
+    return entries
+
+
+_PALETTE = tuple(generate_palette())
 
 
 class Application(object):
 
     def __init__(self):
+        # Widgets and coroutines hold on to the application through this reference
+        self.weak = weakref.ref(self)
         self.config: Config = {}
         self.widgets: Dict[str, urwid.Widget] = dict()
-        self.loop = asyncio.get_event_loop()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
         self.mainloop = urwid.MainLoop(
             self.build(),
-            palette=generate_palette(),
+            palette=_PALETTE,
             handle_mouse=False,
             unhandled_input=self.unhandled_input,
             event_loop=urwid.AsyncioEventLoop(loop=self.loop),
         )
         self.mainloop.screen.set_terminal_properties(colors=256)
-        self.key_buffer: str = ''
 
-        self.buffer_sequences: Dict[str, Callable[[], Any]] = {
+        self.buffer_sequences: Dict[str, Any] = key_sequence_trie({
             'ZZ': self.exit,
+        })
+        self.buffer_node: Dict[str, Any] = self.buffer_sequences
+        # MPD's idle command ties up its connection, so it gets a client of its own
+        self.mpd_locks: Dict[str, asyncio.Lock] = {
+            'cmd': asyncio.Lock(),
+            'idle': asyncio.Lock(),
         }
-        self.mpd_lock = asyncio.Lock()
-        self.mpd: MPDClient = None
+        self.mpd: Dict[str, MPDClient] = {}
 
     def exit(self):
         raise urwid.ExitMainLoop
@@ -545,14 +766,17 @@ class Application(object):
         return self.widgets[name]
 
     def unhandled_input(self, key: str) -> bool:
-        if key == 'esc':
-            self.key_buffer = ''
+        node = self.buffer_node.get(key)
+        if node is None and self.buffer_node is not self.buffer_sequences:
+            # Broken sequence; the key may still start a new one
+            node = self.buffer_sequences.get(key)
+
+        if node is None or callable(node):
+            self.buffer_node = self.buffer_sequences
+            if node is not None:
+                node()
         else:
-            self.key_buffer += key
-            action = self.buffer_sequences.get(self.key_buffer)
-            if action is not None:
-                action()
-                self.key_buffer = ''
+            self.buffer_node = node
 
         return True
 
@@ -594,50 +818,66 @@ class Application(object):
             'background',
         )
 
-    async def async_mpd(self):
-        if not self.mpd:
-            async with self.mpd_lock:
-                if not self.mpd:
-                    self.mpd = await MPDClient(
+    async def async_mpd(self, kind: str = 'cmd') -> MPDClient:
+        # Keep one persistent connection per kind, re-establishing it only if MPD dropped it
+        client = self.mpd.get(kind)
+        if not (client and client.connected):
+            async with self.mpd_locks[kind]:
+                client = self.mpd.get(kind)
+                if not (client and client.connected):
+                    if client:
+                        LOG.info('Lost %s connection to MPD; reconnecting', kind)
+                        client.close()
+
+                    client = self.mpd[kind] = await MPDClient(
                         self.config['mpd']['host'],
                         self.config['mpd']['port']
                     ).connect()
 
-        return self.mpd
+        return client
+
+    def redraw(self, *args):
+        self.mainloop.draw_screen()
 
     def run_coroutine(self, method, *args):
-        run_method_coroutine(self.loop, method, *args)
+        # The event loop no longer polls for idle, so redraw once background work is done
+        task = run_method_coroutine(self.loop, method, *args)
+        task.add_done_callback(self.redraw)
 
     def run(self):
-        self.run_coroutine(self.widget_by_name('playlist').sync, weakref.ref(self))
-        self.loop.create_task(functools.partial(mpd_idle, weakref.ref(self))())
+        self.run_coroutine(self.widget_by_name('playlist').sync, self.weak)
+        self.loop.create_task(mpd_idle(self.weak))
 
         self.mainloop.run()
-        if self.mpd:
-            self.mpd.close()
+        for client in self.mpd.values():
+            client.close()
 
 
 async def mpd_idle(appref):
-    app = appref()
-    if not app:
-        return
-
-    client = await app.async_mpd()
+    backoff = IDLE_RETRY_DELAY
 
     while True:
-        # Wait to let other commands queue up
-        await asyncio.sleep(0.1)
-
-        for subsystems in await client.idle():
-            if not appref():
-                return
-
-            LOG.debug('Subsystems changed: %s', subsystems)
+        app = appref()
+        if not app:
+            return
 
-            if 'playlist' in subsystems or 'player' in subsystems:
-                app.run_coroutine(app.widget_by_name('playlist').sync, appref)
-            if 'database' in subsystems:
-                app.widget_by_name('library').clear()
+        try:
+            client = await app.async_mpd('idle')
+            subsystems = await client.idle()
+        except (OSError, ValueError):
+            LOG.exception('MPD idle failed; retrying in %.1f seconds', backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, IDLE_MAX_RETRY_DELAY)
+            continue
+
+        backoff = IDLE_RETRY_DELAY
+        LOG.debug('Subsystems changed: %s', subsystems)
+
+        if 'playlist' in subsystems or 'player' in subsystems:
+            app.widget_by_name('playlist').schedule_sync(appref)
+        if 'database' in subsystems:
+            app.widget_by_name('library').clear()
+            app.redraw()
 
 
 def mpd_func(command):
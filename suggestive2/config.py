@@ -1,15 +1,10 @@
 """Default configuration"""
 
-from collections import ChainMap
 from typing import Optional
-import importlib
-import inspect
+import functools
+import importlib.machinery
+import importlib.util
 import os
-import random
-import shutil
-import string
-import sys
-import tempfile
 
 import suggestive2.types
 from suggestive2.util import expand
@@ -20,37 +15,36 @@ class Mpd:
     port = 6600
 
 
-def get_temp_package():
-    while True:
-        temp_package = ''.join(random.choice(string.ascii_letters) for _ in range(16))
-        if temp_package not in sys.modules:
-            return temp_package
+SECTIONS = ('Mpd',)
 
 
 def load_config(path: Optional[str] = None) -> suggestive2.types.Config:
     path = expand(path) if path else path
+    mtime = os.path.getmtime(path) if path and os.path.isfile(path) else None
 
-    defaults = {key: vars(value)
-                for key, value in globals().items()
-                if inspect.isclass(value)}
+    # Callers get their own section dicts, so changing them can't corrupt the cached copy
+    return {section: dict(values) for section, values in _load_config(path, mtime).items()}
 
-    if path and os.path.isfile(path):
-        with tempfile.TemporaryDirectory() as tempdir:
-            temp_package = get_temp_package()
-            shutil.copyfile(path, os.path.join(tempdir, f'{temp_package}.py'))
 
-            sys.path.insert(0, tempdir)
-            config = importlib.import_module(temp_package)
+@functools.lru_cache(maxsize=4)
+def _load_config(path: Optional[str], mtime: Optional[float]) -> suggestive2.types.Config:
+    defaults = {name: vars(globals()[name]) for name in SECTIONS}
 
-            config_vals = {
-                section: vars(getattr(config, section)) if hasattr(config, section) else {}
-                for section in defaults
-            }
+    if path and mtime is not None:
+        # Load the file directly, whatever its name; it need not be importable from sys.path
+        loader = importlib.machinery.SourceFileLoader('suggestive2_user_config', path)
+        spec = importlib.machinery.ModuleSpec(loader.name, loader, origin=path)
+        config = importlib.util.module_from_spec(spec)
+        loader.exec_module(config)
 
-            result = {section: ChainMap(config_vals[section], defaults[section])
-                      for section in defaults}
-            del sys.path[0]
+        config_vals = {
+            section: vars(getattr(config, section)) if hasattr(config, section) else {}
+            for section in defaults
+        }
+
+        result = {section: {**defaults[section], **config_vals[section]}
+                  for section in defaults}
     else:
-        result = {section: ChainMap(value) for section, value in defaults.items()}
+        result = {section: dict(value) for section, value in defaults.items()}
 
     return {key.lower(): value for key, value in result.items()}
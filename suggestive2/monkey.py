@@ -15,5 +15,63 @@ def _exception_handler(self, loop, context):
         loop.default_exception_handler(context)
 
 
+_asyncio_loop_init = urwid.AsyncioEventLoop.__init__
+
+
+def _init(self, **kwargs):
+    _asyncio_loop_init(self, **kwargs)
+    self._idle_asyncio_handle = None
+    self._idle_handle = 0
+    self._idle_callbacks = {}
+
+
+def _also_call_idle(self, callback):
+    # There is no such thing as "idle" in asyncio, so instead of polling every few milliseconds
+    # (which keeps the process awake even when nothing happens), run the idle callbacks once
+    # after every alarm or file event
+    def wrapper():
+        if not self._idle_asyncio_handle:
+            self._idle_asyncio_handle = self._loop.call_soon(self._entering_idle)
+        return callback()
+
+    return wrapper
+
+
+def _entering_idle(self):
+    self._idle_asyncio_handle = None
+    for callback in list(self._idle_callbacks.values()):
+        callback()
+
+
+def _alarm(self, seconds, callback):
+    return self._loop.call_later(seconds, self._also_call_idle(callback))
+
+
+def _watch_file(self, fd, callback):
+    self._loop.add_reader(fd, self._also_call_idle(callback))
+    return fd
+
+
+def _enter_idle(self, callback):
+    self._idle_handle += 1
+    self._idle_callbacks[self._idle_handle] = callback
+    return self._idle_handle
+
+
+def _remove_enter_idle(self, handle):
+    return self._idle_callbacks.pop(handle, None) is not None
+
+
 def monkeypatch():
     urwid.AsyncioEventLoop._exception_handler = _exception_handler
+
+    # Newer urwid releases no longer emulate idle by polling (and support coroutine callbacks,
+    # which these replacements don't), so only patch the old implementation
+    if hasattr(urwid.AsyncioEventLoop, '_idle_emulation_delay'):
+        urwid.AsyncioEventLoop.__init__ = _init
+        urwid.AsyncioEventLoop._also_call_idle = _also_call_idle
+        urwid.AsyncioEventLoop._entering_idle = _entering_idle
+        urwid.AsyncioEventLoop.alarm = _alarm
+        urwid.AsyncioEventLoop.watch_file = _watch_file
+        urwid.AsyncioEventLoop.enter_idle = _enter_idle
+        urwid.AsyncioEventLoop.remove_enter_idle = _remove_enter_idle
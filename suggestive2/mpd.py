@@ -1,25 +1,29 @@
 import asyncio
 import logging
-import itertools
-from contextlib import asynccontextmanager
-from typing import Iterable, Optional, Dict, Union, AsyncGenerator, List, cast
+from typing import Any, Iterable, Optional, Dict, Union, AsyncGenerator, List, cast
 
-from suggestive2.util import run_method_coroutine, escape
+from suggestive2.util import run_method_coroutine, bescape
 
 
 LOG = logging.getLogger(__name__)
 LOG.addHandler(logging.NullHandler())
 
+RESPONSE_CHUNK_SIZE = 65536
+
 
 def make_slice(start: Optional[int] = None, end: Optional[int] = None) -> str:
-    if start is not None and end is not None:
-        return f"{start}:{'' if end == -1 else end}"
-    elif start is not None:
-        return f'{start}'
-    elif end is not None:
-        return f":{'' if end == -1 else end}"
-    else:
-        return ''
+    if end is None:
+        return '' if start is None else str(start)
+
+    stop = '' if end == -1 else str(end)
+    return f':{stop}' if start is None else f'{start}:{stop}'
+
+
+def tag_command(name: bytes, tags: Dict[str, Any]) -> bytes:
+    parts = [name]
+    for key, value in tags.items():
+        parts += (key.encode(), bescape(value))
+    return b' '.join(parts) + b'\n'
 
 
 class MPDClient(object):
@@ -31,10 +35,13 @@ class MPDClient(object):
 
         self._noidle_lock = asyncio.Lock()
         self._idle_lock = asyncio.Lock()
-        self._idle_task: Optional[asyncio.Task] = None
+        self._idle_started = asyncio.Event()
+        self._idle_done = asyncio.Event()
+        self._idle_done.set()
 
         self._reader: asyncio.StreamReader = cast(asyncio.StreamReader, None)
         self._writer: asyncio.StreamWriter = cast(asyncio.StreamWriter, None)
+        self._connected = False
 
     async def __aenter__(self) -> 'MPDClient':
         return await self.connect()
@@ -42,20 +49,9 @@ class MPDClient(object):
     async def __aexit__(self, exc_type, exc_value, traceback) -> None:
         self.close()
 
-    @asynccontextmanager
-    async def _acquire(self, lock, name=None):
-        lockname = 'lock' if name is None else f'{name} lock'
-
-        LOG.debug('Waiting for %s (%s)', lockname, lock)
-        async with lock:
-            LOG.debug('Acquired %s (%s)', lockname, lock)
-            yield
-
-        LOG.debug('Released %s (%s)', lockname, lock)
-
     async def connect(self, timeout: Union[float, int] = 1.0) -> 'MPDClient':
-        async with self._acquire(self._lock, 'connect'):
-            if self._reader or self._writer:
+        async with self._lock:
+            if self._connected:
                 LOG.debug('Already connected to MPD on %s:%d', self.host, self.port)
                 return self
 
@@ -76,7 +72,7 @@ class MPDClient(object):
                         f'Unable to understand response from {self.host}:{self.port}; MPD may '
                         f'not be bound to this address')
 
-                version = statusline.decode().strip().rsplit(' ', 1)[-1]
+                version = statusline[7:].rstrip().decode()
                 LOG.info('Connected to MPD version %s on %s:%d', version, self.host, self.port)
             except Exception:
                 writer.close()
@@ -84,79 +80,132 @@ class MPDClient(object):
 
             self._reader: asyncio.StreamReader = reader
             self._writer: asyncio.StreamWriter = writer
+            self._connected = True
 
             return self
 
+    @property
+    def connected(self) -> bool:
+        return (self._connected and
+                not self._reader.at_eof() and
+                not self._writer.is_closing())
+
     def close(self) -> None:
-        if not (self._reader and self._writer):
+        if not self._connected:
             return
 
-        self._writer.write(b'close\n')
-        self._writer.close()
+        if not self._writer.is_closing():
+            self._writer.write(b'close\n')
+            self._writer.close()
 
-    async def _send_command(self, command: str) -> None:
-        LOG.debug("Running mpd command '%s'", command)
+        self._reader = cast(asyncio.StreamReader, None)
+        self._writer = cast(asyncio.StreamWriter, None)
+        self._connected = False
 
-        self._writer.write(command.encode() + b'\n')
+    async def _send_command(self, command: bytes) -> None:
+        LOG.debug("Running mpd command %r", command)
+
+        self._writer.write(command)
         await self._writer.drain()
 
     async def _run(self,
-                   command: str,
-                   timeout: Optional[Union[float, int]] = 1.0) -> AsyncGenerator[str, str]:
-        if command != 'idle' and self._lock.locked() and self._idle_lock.locked():
-            while self._idle_task is None:
-                await asyncio.sleep(0.01)
+                   command: bytes,
+                   timeout: Optional[Union[float, int]] = 1.0) -> AsyncGenerator[memoryview, None]:
+        if command != b'idle\n' and self._lock.locked() and self._idle_lock.locked():
+            await self._idle_started.wait()
 
             async with self._noidle_lock:
-                if self._idle_task is not None:
-                    await self._send_command('noidle')
-
-                    while self._idle_task is not None:
-                        await asyncio.sleep(0.01)
+                if self._idle_started.is_set():
+                    await self._send_command(b'noidle\n')
+                    await self._idle_done.wait()
 
-        if not (self._reader and self._writer):
+        if not self._connected:
             await self.connect()
 
-        async with self._acquire(self._lock, f"command '{command}'"):
+        async with self._lock:
             await self._send_command(command)
 
-            while True:
-                try:
-                    line = await asyncio.wait_for(self._reader.readline(), timeout=timeout)
-                except Exception as exc:
-                    raise ValueError(f'fak! {command}') from exc
-
-                LOG.debug('MPD line from command %s: %s', command, line)
+            try:
+                data = await self._read_response(timeout)
+            except asyncio.TimeoutError as exc:
+                # The rest of the response would otherwise be read as the next command's reply
+                self.close()
+                raise ValueError(f'fak! {command.decode().rstrip()}') from exc
+
+        # Start of the final OK/ACK line
+        end = data.rfind(b'\n', 0, -1) + 1
+        if data.startswith(b'ACK ', end):
+            LOG.debug('Error response: %s', data[end:])
+            msg = data[end:-1].decode().split(' ', 3)[-1]
+            raise ValueError(f'MPD error: {msg}')
+
+        # Lines are views into the response buffer, so skipped lines are never copied
+        debug = LOG.isEnabledFor(logging.DEBUG)
+        view = memoryview(data)
+        start = 0
+        while start < end:
+            newline = data.find(b'\n', start)
+            if debug:
+                LOG.debug('MPD line from command %s: %s', command, data[start:newline])
+            yield view[start:newline]
+            start = newline + 1
+
+    async def _read_response(self, timeout: Optional[Union[float, int]]) -> bytearray:
+        data = bytearray()
+        while True:
+            # The timeout bounds the wait for each chunk, not the whole response, so long
+            # responses that keep streaming don't time out
+            chunk = await asyncio.wait_for(self._reader.read(RESPONSE_CHUNK_SIZE), timeout=timeout)
+            if not chunk:
+                self.close()
+                raise ConnectionError('Unable to read command output')
+
+            data += chunk
+            if not data.endswith(b'\n'):
+                continue
+
+            # Responses end with an OK line, or an ACK line on error; tag lines never look
+            # like either
+            last = data.rfind(b'\n', 0, -1) + 1
+            if data.startswith(b'OK\n', last) or data.startswith(b'ACK ', last):
+                return data
+
+    async def _run_list(self, *args, **kwargs) -> List[memoryview]:
+        return [line async for line in self._run(*args, **kwargs)]
 
-                if line is None:
-                    raise ConnectionError('Unable to read command output')
-                elif line.startswith(b'ACK '):
-                    LOG.debug('Error response: %s', line)
-                    msg = line.decode().split(' ', 3)[-1]
-                    raise ValueError(f'MPD error: {msg}')
+    async def _run_void(self, *args, **kwargs) -> None:
+        async for _ in self._run(*args, **kwargs):
+            pass
 
-                if line == b'OK\n':
-                    return
+    async def pipeline(self, *commands: bytes) -> List[List[bytes]]:
+        # Send newline-terminated commands in one command list, costing a single round trip
+        command = b''.join((b'command_list_ok_begin\n', *commands, b'command_list_end\n'))
 
-                yield line.decode().strip()
+        results: List[List[bytes]] = []
+        output: List[bytes] = []
+        async for line in self._run(command):
+            if line == b'list_OK':
+                results.append(output)
+                output = []
+            else:
+                output.append(bytes(line))
 
-    async def _run_list(self, *args, **kwargs) -> List[str]:
-        return [line async for line in self._run(*args, **kwargs)]
+        return results
 
     async def _run_tagged(self,
-                          command: str,
+                          command: bytes,
                           type_: str,
                           **kwargs) -> AsyncGenerator[Dict[str, str], str]:
         obj: Dict[str, str] = {}
         async for line in self._run(command, **kwargs):
-            tag, value = line.split(': ', 1)
-            tag = tag.lower()
+            tag_b, _, value = bytes(line).partition(b': ')
+            tag = tag_b.lower().decode()
 
             if tag == type_ and obj:
                 yield obj
                 obj = {}
 
-            obj[tag] = value
+            obj[tag] = value.decode()
 
         if obj:
             yield obj
@@ -167,10 +216,10 @@ class MPDClient(object):
         if groupby is None:
             groupby = []
 
-        command = ' '.join(itertools.chain(
-            ('list', type_),
-            itertools.chain.from_iterable(('group', escape(group)) for group in groupby),
-        ))
+        parts = [b'list', type_.encode()]
+        for group in groupby:
+            parts += (b'group', bescape(group))
+        command = b' '.join(parts) + b'\n'
 
         async for item in self._run_tagged(command, type_):
             yield item
@@ -181,69 +230,66 @@ class MPDClient(object):
             end: Optional[int] = None
     ) -> AsyncGenerator[Dict[str, str], str]:
         spec = make_slice(start, end)
-        command = f'playlistinfo {spec}' if spec else 'playlistinfo'
+        command = b'playlistinfo %s\n' % spec.encode() if spec else b'playlistinfo\n'
 
         async for item in self._run_tagged(command, 'file'):
             yield item
 
     async def _idle(self) -> List[str]:
-        items = self._run_tagged('idle', 'changed', timeout=None)
+        items = self._run_tagged(b'idle\n', 'changed', timeout=None)
         return [item['changed'] async for item in items]
 
     async def idle(self) -> List[str]:
-        async with self._acquire(self._idle_lock, 'idle'):
-            task = run_method_coroutine(asyncio.get_event_loop(), self._idle)
-            self._idle_task = task
+        async with self._idle_lock:
+            task = run_method_coroutine(asyncio.get_running_loop(), self._idle)
+            self._idle_done.clear()
+            self._idle_started.set()
 
             try:
                 result = await task
                 return result
             finally:
-                self._idle_task = None
+                self._idle_started.clear()
+                self._idle_done.set()
 
     async def clear(self) -> None:
-        await self._run_list('clear')
+        await self._run_void(b'clear\n')
 
     async def pause(self) -> None:
-        await self._run_list('pause')
+        await self._run_void(b'pause\n')
 
     async def searchadd(self, **tags) -> None:
-        command = ' '.join(itertools.chain(
-            ('searchadd',),
-            itertools.chain.from_iterable(
-                (key, escape(value)) for key, value in tags.items()
-            ),
-        ))
-        await self._run_list(command)
+        command = tag_command(b'searchadd', tags)
+        await self._run_void(command)
 
     async def playlistsearch(self, **tags) -> AsyncGenerator[Dict[str, str], str]:
-        command = ' '.join(itertools.chain(
-            ('playlistsearch',),
-            itertools.chain.from_iterable(
-                (key, escape(value)) for key, value in tags.items()
-            ),
-        ))
+        command = tag_command(b'playlistsearch', tags)
         async for track in self._run_tagged(command, 'file'):
             yield track
 
     async def playid(self, track_id: int) -> None:
-        await self._run_list(f'playid {track_id}')
+        await self._run_void(b'playid %d\n' % track_id)
 
     async def play(self, position: int) -> None:
-        await self._run_list(f'play {position}')
+        await self._run_void(b'play %d\n' % position)
 
     async def delete(self,
                      start: int,
                      end: Optional[int] = None) -> None:
         spec = make_slice(start, end)
-        await self._run_list(f'delete {spec}')
+        await self._run_void(b'delete %s\n' % spec.encode())
 
     async def next(self) -> None:
-        await self._run_list('next')
+        await self._run_void(b'next\n')
 
     async def previous(self) -> None:
-        await self._run_list('previous')
+        await self._run_void(b'previous\n')
+
+    async def status(self) -> Dict[str, str]:
+        lines = await self._run_list(b'status\n')
+        return {tag.lower().decode(): value.decode()
+                for tag, _, value in (bytes(line).partition(b': ') for line in lines)}
 
     async def currentsong(self) -> Optional[Dict[str, str]]:
-        result = [track async for track in self._run_tagged('currentsong', 'file')]
+        result = [track async for track in self._run_tagged(b'currentsong\n', 'file')]
         return result[0] if result else None
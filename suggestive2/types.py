@@ -1,4 +1,4 @@
-from typing import ChainMap, Dict, Any
+from typing import Dict, Any
 
 
-Config = Dict[str, ChainMap[str, Any]]
+Config = Dict[str, Dict[str, Any]]
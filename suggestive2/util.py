@@ -1,8 +1,9 @@
 import weakref
 import os.path
-from itertools import dropwhile, takewhile
+import unicodedata
+from functools import lru_cache
 
-from typing import Any, List
+from typing import Any, Callable, Dict
 
 
 ESCAPE_TRANSLATION = str.maketrans({
@@ -12,37 +13,31 @@ ESCAPE_TRANSLATION = str.maketrans({
 })
 
 
+@lru_cache(maxsize=128)
 def expand(path: str) -> str:
     return os.path.abspath(os.path.expanduser(os.path.expandvars(path)))
 
 
-def run_method_coroutine(loop, method, *args):
-    proxy = weakref.proxy(method.__self__)
-    weak_method = method.__func__.__get__(proxy)
-    return loop.create_task(weak_method(*args))
+def normalize(value: str) -> str:
+    # ASCII, which most tags are, is already NFC
+    return value if value.isascii() else unicodedata.normalize('NFC', value)
 
 
-def escape(value: Any) -> str:
-    escaped = str(value).translate(ESCAPE_TRANSLATION)
-    return f'"{escaped}"'
+def run_method_coroutine(loop, method, *args):
+    return loop.create_task(method.__func__(weakref.proxy(method.__self__), *args))
 
 
-def prefix_matches(prefix: str, words: List[str]) -> List[str]:
-    return _prefix_search('', prefix, words)
+def key_sequence_trie(sequences: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    root: Dict[str, Any] = {}
+    for sequence, action in sequences.items():
+        node = root
+        for key in sequence[:-1]:
+            node = node.setdefault(key, {})
+        node[sequence[-1]] = action
 
+    return root
 
-def _prefix_search(prefix: str, suffix: str, words: List[str]) -> List[str]:
-    if not words:
-        return []
-    elif not suffix:
-        return [prefix + word for word in words]
 
-    matches = list(takewhile(
-        lambda word: word and word[0] == suffix[0],
-        dropwhile(
-            lambda word: not (word and word[0] == suffix[0]),
-            words
-        )
-    ))
-    remaining = [word[1:] for word in matches]
-    return _prefix_search(prefix + suffix[0], suffix[1:], remaining)
+def bescape(value: Any) -> bytes:
+    text = value if type(value) is str else str(value)
+    return b'"' + text.translate(ESCAPE_TRANSLATION).encode() + b'"'
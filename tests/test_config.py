@@ -1,7 +1,7 @@
 import tempfile
 import pytest
 import os.path
-from suggestive2.config import load_config
+from suggestive2.config import load_config, _load_config
 
 
 @pytest.fixture
@@ -31,3 +31,45 @@ class Mpd:
     conf = load_config(path)
     assert conf['mpd']['host'] == 'override-host'
     assert conf['mpd']['port'] == 12345
+
+
+def test_config_cached(tempdir):
+    path = os.path.join(tempdir, 'myconfig.py')
+    with open(path, 'w') as f:
+        f.write("""\
+class Mpd:
+    port = 12345
+""")
+
+    _load_config.cache_clear()
+    conf = load_config(path)
+    conf['mpd']['port'] = 1
+
+    assert load_config(path)['mpd']['port'] == 12345
+    assert _load_config.cache_info().hits == 1
+    assert _load_config.cache_info().misses == 1
+
+    # Rewriting the file changes its mtime, so it's loaded again
+    with open(path, 'w') as f:
+        f.write("""\
+class Mpd:
+    port = 54321
+""")
+    mtime = os.path.getmtime(path) + 1
+    os.utime(path, (mtime, mtime))
+
+    assert load_config(path)['mpd']['port'] == 54321
+    assert _load_config.cache_info().misses == 2
+
+
+def test_config_any_extension(tempdir):
+    path = os.path.join(tempdir, 'myconfig.conf')
+    with open(path, 'w') as f:
+        f.write("""\
+class Mpd:
+    host = 'override-host'
+""")
+
+    conf = load_config(path)
+    assert conf['mpd']['host'] == 'override-host'
+    assert conf['mpd']['port'] == 6600
@@ -9,11 +9,12 @@ pytestmark = pytest.mark.asyncio
 
 class MockServer(object):
 
-    def __init__(self, host, port, loop, statusline=None):
+    def __init__(self, host, port, loop, statusline=None, delay=None):
         self.host = host
         self.port = port
         self.loop = loop
         self.statusline = statusline or b'OK MPD 0.20.0'
+        self.delay = delay
         self._lines = []
 
     @property
@@ -33,7 +34,14 @@ class MockServer(object):
                 if not line:
                     break
 
-                writer.write(outline.encode() + b'\n')
+                if self.delay is None:
+                    writer.write(outline.encode() + b'\n')
+                else:
+                    # Stream the response a line at a time
+                    for part in outline.split('\n'):
+                        await asyncio.sleep(self.delay)
+                        writer.write(part.encode() + b'\n')
+
                 await writer.drain()
         finally:
             writer.close()
@@ -92,3 +100,83 @@ async def test_no_connection(unused_tcp_port):
         exc.match(f'Unable to connect to 127.0.0.1:{unused_tcp_port}')
 
     client.close()
+
+
+async def test_status(server):
+    server.lines = ['volume: 100\nrepeat: 0\nplaylistlength: 12\nOK']
+
+    client = MPDClient(server.host, server.port)
+    await client.connect()
+    status = await client.status()
+    client.close()
+
+    assert status['playlistlength'] == '12'
+    assert status['volume'] == '100'
+
+
+async def test_error(server):
+    server.lines = ['ACK [50@0] {play} No such song']
+
+    client = MPDClient(server.host, server.port)
+    await client.connect()
+    with pytest.raises(ValueError) as exc:
+        await client.play(99)
+    client.close()
+
+    exc.match('MPD error: No such song')
+
+
+async def test_pipeline(server):
+    server.lines = ['volume: 100\nlist_OK\nlist_OK\nOK']
+
+    client = MPDClient(server.host, server.port)
+    await client.connect()
+    results = await client.pipeline(b'status\n', b'play 0\n')
+    client.close()
+
+    assert results == [[b'volume: 100'], []]
+
+
+async def test_playlistinfo(server):
+    server.lines = ['file: a.flac\nTitle: A\nId: 1\nfile: b.flac\nTitle: B: Side\nId: 2\nOK']
+
+    client = MPDClient(server.host, server.port)
+    await client.connect()
+    tracks = [track async for track in client.playlistinfo()]
+    client.close()
+
+    assert tracks == [
+        {'file': 'a.flac', 'title': 'A', 'id': '1'},
+        {'file': 'b.flac', 'title': 'B: Side', 'id': '2'},
+    ]
+
+
+async def test_slow_response(server):
+    server.delay = 0.05
+    server.lines = ['\n'.join(f'file: {i}' for i in range(8)) + '\nOK', 'volume: 100\nOK']
+
+    client = MPDClient(server.host, server.port)
+    await client.connect()
+    lines = await client._run_list(b'playlistinfo\n', timeout=0.2)
+    status = await client.status()
+    client.close()
+
+    assert len(lines) == 8
+    assert status == {'volume': '100'}
+
+
+async def test_timeout_reconnects(server):
+    server.delay = 0.3
+    server.lines = ['file: 0\nOK', 'volume: 100\nOK']
+
+    client = MPDClient(server.host, server.port)
+    await client.connect()
+    with pytest.raises(ValueError):
+        await client._run_list(b'playlistinfo\n', timeout=0.2)
+
+    assert not client.connected
+
+    status = await client.status()
+    client.close()
+
+    assert status == {'volume': '100'}
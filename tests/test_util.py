@@ -0,0 +1,40 @@
+import unicodedata
+
+from suggestive2.mpd import make_slice
+from suggestive2.util import normalize, key_sequence_trie, bescape
+
+
+def test_normalize_ascii():
+    value = 'The Black Angels'
+    assert normalize(value) is value
+
+
+def test_normalize_decomposed():
+    value = unicodedata.normalize('NFD', 'Mäppchen')
+    assert normalize(value) == 'Mäppchen'
+    assert len(normalize(value)) == len('Mäppchen')
+
+
+def test_key_sequence_trie():
+    def action():
+        pass
+
+    assert key_sequence_trie({'ZZ': action, 'ZQ': action, 'g': action}) == {
+        'Z': {'Z': action, 'Q': action},
+        'g': action,
+    }
+
+
+def test_bescape():
+    assert bescape('say "hi"\n') == b'"say \\"hi\\""'
+    assert bescape(12) == b'"12"'
+    assert bescape('Mäppchen') == '"Mäppchen"'.encode()
+
+
+def test_make_slice():
+    assert make_slice() == ''
+    assert make_slice(3) == '3'
+    assert make_slice(3, 5) == '3:5'
+    assert make_slice(3, -1) == '3:'
+    assert make_slice(end=5) == ':5'
+    assert make_slice(end=-1) == ':'